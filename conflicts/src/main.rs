@@ -43,6 +43,7 @@ struct Config {
 
 fn init_git(monotree_dir: &std::path::Path, repos: &Vec<util::Slug>) {
     if monotree_dir.is_dir() {
+        set_per_run_config(monotree_dir);
         return;
     }
     for sl in repos {
@@ -57,7 +58,6 @@ fn init_git(monotree_dir: &std::path::Path, repos: &Vec<util::Slug>) {
             );
         }
         println!("Set git metadata");
-        util::chdir(monotree_dir);
         {
             let err = "git config file error";
             let mut f = std::fs::OpenOptions::new()
@@ -66,21 +66,56 @@ fn init_git(monotree_dir: &std::path::Path, repos: &Vec<util::Slug>) {
                 .expect(err);
             writeln!(f, "[remote \"con_pull_ref/{sl}\"]").expect(err);
             writeln!(f, "    url = {url}").expect(err);
-            writeln!(f, "    fetch = +refs/pull/*:refs/remotes/upstream-pull/*").expect(err);
+            // Namespace the local refs per slug, so two repos sharing a
+            // pull number never map to the same ref.
+            writeln!(
+                f,
+                "    fetch = +refs/pull/*:refs/remotes/upstream-pull/{sl}/*"
+            )
+            .expect(err);
         }
-        util::check_call(util::git().args(["config", "fetch.showForcedUpdates", "false"]));
-        util::check_call(util::git().args(["config", "user.email", "no@ne.nl"]));
-        util::check_call(util::git().args(["config", "user.name", "none"]));
-        util::check_call(util::git().args(["config", "gc.auto", "0"]));
+        util::check_call(util::git_in(monotree_dir).args([
+            "config",
+            "fetch.showForcedUpdates",
+            "false",
+        ]));
+        util::check_call(util::git_in(monotree_dir).args(["config", "user.email", "no@ne.nl"]));
+        util::check_call(util::git_in(monotree_dir).args(["config", "user.name", "none"]));
+        util::check_call(util::git_in(monotree_dir).args(["config", "gc.auto", "0"]));
     }
+    set_per_run_config(monotree_dir);
+}
+
+fn set_per_run_config(monotree_dir: &std::path::Path) {
+    // Keep the commit-graph current, so that the ancestry walks pruning
+    // trivially clean pairs stay cheap as the repo grows. Set on every run,
+    // not only at clone time: git config is idempotent, and deployments
+    // cloned before the setting existed would otherwise never pick it up.
+    util::check_call(util::git_in(monotree_dir).args(["config", "fetch.writeCommitGraph", "true"]));
+}
+
+struct PullData {
+    number: u64,
+    html_url: String,
+    title: String,
+    user_login: String,
 }
 
 struct MetaPull {
-    pull: octocrab::models::pulls::PullRequest,
+    pull: PullData,
     head_commit: String,
     slug: util::Slug,
     slug_num: String,
     merge_commit: Option<String>,
+    changed_paths: std::collections::HashSet<String>,
+}
+
+/// What is known about a pull's metadata comment from the previous run: its
+/// id, and the conflicts section text that was last written to it.
+#[derive(serde::Serialize, serde::Deserialize)]
+struct CommentCache {
+    id: octocrab::models::CommentId,
+    text: String,
 }
 
 fn merge_strategy() -> &'static str {
@@ -88,31 +123,69 @@ fn merge_strategy() -> &'static str {
     "--strategy=ort"
 }
 
-fn calc_mergeable(pulls: Vec<MetaPull>, base_branch: &str) -> Vec<MetaPull> {
+fn calc_mergeable(
+    pulls: Vec<MetaPull>,
+    base_branch: &str,
+    work_dir: &std::path::Path,
+) -> Vec<MetaPull> {
     let base_id = util::check_output(
-        util::git()
+        util::git_in(work_dir)
             .args(["log", "-1", "--format=%H"])
             .arg(format!("origin/{base_branch}")),
     );
     let mut ret = Vec::new();
     for mut p in pulls {
-        util::check_call(util::git().args(["checkout", &base_id, "--quiet"]));
+        // Reuse the prepared-base commit from a previous run when neither
+        // the base nor the pull head moved. A cached value equal to the
+        // base commit records a previously failed merge.
+        let cache_ref = format!("refs/merge-cache/{base_id}/{head}", head = p.head_commit);
+        let cached = util::git_in(work_dir)
+            .args(["rev-parse", "--quiet", "--verify", &cache_ref])
+            .output()
+            .expect("command error");
+        if cached.status.success() {
+            let cached_id = String::from_utf8(cached.stdout)
+                .expect("invalid utf8")
+                .trim()
+                .to_string();
+            if cached_id != base_id {
+                p.merge_commit = Some(cached_id);
+                ret.push(p);
+            }
+            continue;
+        }
+        util::check_call(util::git_in(work_dir).args(["checkout", &base_id, "--quiet"]));
         let mergeable = util::call(
-            util::git()
+            util::git_in(work_dir)
                 .args(["merge", merge_strategy(), "--quiet", &p.head_commit, "-m"])
                 .arg(format!("Prepare base for {id}", id = p.slug_num)),
         );
 
         if mergeable {
-            p.merge_commit = Some(util::check_output(util::git().args([
+            let merge_id = util::check_output(util::git_in(work_dir).args([
                 "log",
                 "-1",
                 "--format=%H",
                 "HEAD",
-            ])));
+            ]));
+            // The worktree shares the persist repo's refs and objects, so
+            // recording the ref is all the next run needs.
+            util::check_call(
+                util::git_in(work_dir)
+                    .args(["update-ref"])
+                    .arg(&cache_ref)
+                    .arg(&merge_id),
+            );
+            p.merge_commit = Some(merge_id);
             ret.push(p);
         } else {
-            util::check_call(util::git().args(["merge", "--abort"]));
+            util::check_call(util::git_in(work_dir).args(["merge", "--abort"]));
+            util::check_call(
+                util::git_in(work_dir)
+                    .args(["update-ref"])
+                    .arg(&cache_ref)
+                    .arg(&base_id),
+            );
         }
     }
     ret
@@ -121,38 +194,94 @@ fn calc_mergeable(pulls: Vec<MetaPull>, base_branch: &str) -> Vec<MetaPull> {
 fn calc_conflicts<'a>(
     pulls_mergeable: &'a Vec<MetaPull>,
     pull_check: &MetaPull,
+    base_branch: &str,
+    branch_id: &str,
+    pair_cache: &std::sync::Mutex<std::collections::HashMap<String, bool>>,
+    work_dir: &std::path::Path,
 ) -> Vec<&'a MetaPull> {
+    let base_id = pull_check.merge_commit.as_ref().expect("merge id missing");
+    // Prune pulls whose head is already contained in the prepared base;
+    // their pair-merge is trivially clean. One rev-list over the few
+    // commits the prepared merge added on top of the base branch suffices.
+    let contained = util::check_output(
+        util::git_in(work_dir)
+            .args(["rev-list", base_id])
+            .arg(format!("^origin/{base_branch}")),
+    );
+    let contained = contained.lines().collect::<std::collections::HashSet<_>>();
+    let pulls_other = pulls_mergeable
+        .iter()
+        .filter(|p| {
+            p.slug_num != pull_check.slug_num
+                && !contained.contains(p.head_commit.as_str())
+                // Pulls touching only files this pull leaves alone cannot
+                // produce a content conflict.
+                && !p.changed_paths.is_disjoint(&pull_check.changed_paths)
+        })
+        .collect::<Vec<_>>();
+    if pulls_other.is_empty() {
+        return Vec::new();
+    }
+    // The pair result is deterministic in the base and the two pull heads,
+    // and symmetric in the heads, so serve pairs unchanged since a previous
+    // run from the cache under a canonical key.
+    let pair_key = |other: &MetaPull| {
+        let (a, b) = if pull_check.head_commit < other.head_commit {
+            (&pull_check.head_commit, &other.head_commit)
+        } else {
+            (&other.head_commit, &pull_check.head_commit)
+        };
+        format!("{branch_id}/{a}/{b}")
+    };
     let mut conflicts = Vec::new();
-    let base_id = util::check_output(util::git().args([
-        "log",
-        "-1",
-        "--format=%H",
-        pull_check.merge_commit.as_ref().expect("merge id missing"),
-    ]));
-    for pull_other in pulls_mergeable {
-        if pull_check.slug_num == pull_other.slug_num {
-            continue;
+    let mut pulls_merge = Vec::new();
+    {
+        let cache = pair_cache.lock().expect("lock error");
+        for p in pulls_other {
+            match cache.get(&pair_key(p)) {
+                Some(true) => conflicts.push(p),
+                Some(false) => {}
+                None => pulls_merge.push(p),
+            }
         }
-        util::check_call(util::git().args(["checkout", &base_id, "--quiet"]));
-        if !util::call(
-            util::git()
-                .args([
-                    "merge",
-                    merge_strategy(),
-                    "--quiet",
-                    &pull_other.head_commit,
-                    "-m",
-                ])
-                .arg(format!(
-                    "Merge base_{pr_id}+{pr_o_id}",
-                    pr_id = pull_check.slug_num,
-                    pr_o_id = pull_other.slug_num
-                )),
-        ) {
-            util::check_call(util::git().args(["merge", "--abort"]));
+    }
+    if pulls_merge.is_empty() {
+        return conflicts;
+    }
+    // Batch all remaining pair-merges into a single in-memory merge-ort
+    // process. This never touches the index or the worktree, so no checkout
+    // or abort is needed for each pair.
+    let batch = pulls_merge
+        .iter()
+        .map(|p| format!("{base_id} {head}\n", head = p.head_commit))
+        .collect::<String>();
+    let stdout = util::check_output_with_input(
+        util::git_in(work_dir).args(["merge-tree", "--write-tree", "--name-only", "-z", "--stdin"]),
+        &batch,
+    );
+    let mut tokens = stdout.split('\0');
+    let parse_err = "merge-tree parse error";
+    let mut new_entries = Vec::new();
+    for pull_other in pulls_merge {
+        let merge_status = tokens.next().expect(parse_err);
+        tokens.next().expect(parse_err); // OID of toplevel tree
+        if merge_status == "0" {
+            // Conflict: skip the file name section and the informational
+            // messages, each terminated by an empty token.
+            while !tokens.next().expect(parse_err).is_empty() {}
+            while !tokens.next().expect(parse_err).is_empty() {}
+            new_entries.push((pair_key(pull_other), true));
             conflicts.push(pull_other);
+        } else {
+            assert_eq!(merge_status, "1");
+            assert!(tokens.next().expect(parse_err).is_empty());
+            new_entries.push((pair_key(pull_other), false));
         }
     }
+    {
+        let mut cache = pair_cache.lock().expect("lock error");
+        cache.extend(new_entries);
+    }
     conflicts
 }
 
@@ -162,34 +291,23 @@ async fn update_comment(
     dry_run: bool,
     pull: &MetaPull,
     pulls_conflict: &Vec<&MetaPull>,
+    comment_cache: &mut std::collections::HashMap<String, CommentCache>,
 ) -> octocrab::Result<()> {
-    let api_issues = api.issues(&pull.slug.owner, &pull.slug.repo);
-    let mut cmt = util::get_metadata_sections(api, &api_issues, pull.pull.number).await?;
-    if pulls_conflict.is_empty() {
-        if cmt.id.is_none() || !cmt.has_section(&util::IdComment::SecConflicts) {
-            // No conflict and no section to update
-            return Ok(());
-        }
-        // Update section for no conflicts
-        util::update_metadata_comment(
-            &api_issues,
-            &mut cmt,
-            &format!(
-                "\n### {hd}\n{txt}",
-                hd = config.conflicts_heading,
-                txt = config.conflicts_empty,
-            ),
-            util::IdComment::SecConflicts,
-            dry_run,
+    // Which pairs come from the pair cache and which from the merge batch
+    // depends on thread timing, so the computed order is unstable across
+    // runs. Sort before rendering; unstable text would defeat the
+    // unchanged-section skip below and cause spurious comment edits.
+    let mut pulls_conflict = pulls_conflict.clone();
+    pulls_conflict.sort_by_key(|p| (p.slug.str(), p.pull.number));
+    let text = if pulls_conflict.is_empty() {
+        format!(
+            "\n### {hd}\n{txt}",
+            hd = config.conflicts_heading,
+            txt = config.conflicts_empty,
         )
-        .await?;
-        return Ok(());
-    }
-
-    util::update_metadata_comment(
-        &api_issues,
-        &mut cmt,
-        &format!(
+    } else {
+        let slug_prefix = format!("{sl}/", sl = pull.slug.str());
+        format!(
             "\n### {hd}\n{txt}",
             hd = config.conflicts_heading,
             txt = config.conflicts_description.replace(
@@ -198,21 +316,59 @@ async fn update_comment(
                     .iter()
                     .map(|p| format!(
                         "\n* [#{sn}]({url}) ({title} by {user})",
-                        sn = p
-                            .slug_num
-                            .trim_start_matches(&format!("{sl}/", sl = pull.slug.str())),
-                        url = p.pull.html_url.as_ref().expect("remote api error"),
-                        title = p.pull.title.as_ref().expect("remote api error").trim(),
-                        user = p.pull.user.as_ref().expect("remote api error").login
+                        sn = p.slug_num.trim_start_matches(&slug_prefix),
+                        url = p.pull.html_url,
+                        title = p.pull.title.trim(),
+                        user = p.pull.user_login
                     ))
                     .collect::<Vec<_>>()
                     .join("")
             )
-        ),
+        )
+    };
+    // A section identical to the one written last run needs no request at
+    // all, not even the comment fetch.
+    if let Some(entry) = comment_cache.get(&pull.slug_num) {
+        if entry.text == text {
+            return Ok(());
+        }
+    }
+    let api_issues = api.issues(&pull.slug.owner, &pull.slug.repo);
+    // Fetch the metadata comment directly when its id is known from a
+    // previous run, instead of scanning the whole comment thread again.
+    let known = match comment_cache.get(&pull.slug_num) {
+        Some(entry) => match api_issues.get_comment(entry.id).await {
+            Ok(c) => {
+                let found = util::get_metadata_sections_from_comments(&vec![c], pull.pull.number);
+                found.id.is_some().then_some(found)
+            }
+            Err(_) => None,
+        },
+        None => None,
+    };
+    let mut cmt = match known {
+        Some(c) => c,
+        None => util::get_metadata_sections(api, &api_issues, pull.pull.number).await?,
+    };
+    if pulls_conflict.is_empty()
+        && (cmt.id.is_none() || !cmt.has_section(&util::IdComment::SecConflicts))
+    {
+        // No conflict and no section to update
+        return Ok(());
+    }
+    util::update_metadata_comment(
+        &api_issues,
+        &mut cmt,
+        &text,
         util::IdComment::SecConflicts,
         dry_run,
     )
     .await?;
+    if !dry_run {
+        if let Some(id) = cmt.id {
+            comment_cache.insert(pull.slug_num.clone(), CommentCache { id, text });
+        }
+    }
     Ok(())
 }
 
@@ -241,104 +397,299 @@ async fn main() -> octocrab::Result<()> {
                 .join("_"),
         )
         .join("persist");
-    let temp_dir = monotree_dir.parent().unwrap().join("temp");
-    std::fs::create_dir_all(&temp_dir).expect("invalid temp_dir");
 
     init_git(&monotree_dir, &args.github_repo);
 
-    println!("Fetching diffs ...");
-    util::chdir(&monotree_dir);
-    util::check_call(util::git().args(["fetch", "--quiet", "--all"]));
+    // With gc.auto=0 nothing ever repacks the persist repo, and that very
+    // setting also short-circuits the need-to-gc check of --auto, so the
+    // default must be restored for this one call. Let git decide cheaply
+    // once per run whether maintenance is worth it. The disk-bound
+    // maintenance has no dependency on the network-bound pull listing below,
+    // so run it in the background and join before the fetches need the repo.
+    let maintenance = tokio::task::spawn_blocking({
+        let dir = monotree_dir.clone();
+        move || {
+            util::check_call(util::git_in(&dir).args([
+                "-c",
+                "gc.auto=6700",
+                "maintenance",
+                "run",
+                "--auto",
+                "--quiet",
+            ]));
+        }
+    });
 
-    let mut base_names = Vec::new();
-    let mut pull_blobs = Vec::new();
-    for s in &args.github_repo {
+    // Hydrate the metadata for all repos concurrently. A single GraphQL
+    // query per page of 100 pulls replaces the REST repo lookup and the
+    // paged pull listing.
+    let hydrated = futures::future::try_join_all(args.github_repo.iter().map(|s| async {
         let util::Slug { owner, repo } = s;
         println!("Fetching open pulls for {sl} ...", sl = s.str());
-        let base_name = github
-            .repos(owner, repo)
-            .get()
-            .await?
-            .default_branch
-            .expect("remote api error");
-        let pulls_api = github.pulls(owner, repo);
-        let pulls = github
-            .all_pages(
-                pulls_api
-                    .list()
-                    .state(octocrab::params::State::Open)
-                    .base(&base_name)
-                    .send()
-                    .await?,
-            )
-            .await?;
+        let query = r#"
+            query($owner: String!, $name: String!, $cursor: String) {
+              repository(owner: $owner, name: $name) {
+                defaultBranchRef { name }
+                pullRequests(states: OPEN, first: 100, after: $cursor) {
+                  nodes { number title url baseRefName author { login } }
+                  pageInfo { hasNextPage endCursor }
+                }
+              }
+            }"#;
+        let err = "remote api error";
+        let mut base_name = String::new();
+        let mut pulls = Vec::new();
+        let mut cursor = serde_json::Value::Null;
+        loop {
+            let reply: serde_json::Value = github
+                .graphql(&serde_json::json!({
+                    "query": query,
+                    "variables": { "owner": owner, "name": repo, "cursor": cursor },
+                }))
+                .await?;
+            let repository = &reply["data"]["repository"];
+            base_name = repository["defaultBranchRef"]["name"]
+                .as_str()
+                .expect(err)
+                .to_string();
+            for p in repository["pullRequests"]["nodes"].as_array().expect(err) {
+                if p["baseRefName"].as_str().expect(err) != base_name {
+                    continue;
+                }
+                pulls.push(PullData {
+                    number: p["number"].as_u64().expect(err),
+                    html_url: p["url"].as_str().expect(err).to_string(),
+                    title: p["title"].as_str().expect(err).to_string(),
+                    user_login: p["author"]["login"].as_str().unwrap_or("ghost").to_string(),
+                });
+            }
+            let page_info = &repository["pullRequests"]["pageInfo"];
+            if !page_info["hasNextPage"].as_bool().expect(err) {
+                break;
+            }
+            cursor = page_info["endCursor"].clone();
+        }
         println!(
             "Open {base_name}-pulls for {sl}: {len}",
             sl = s.str(),
             len = pulls.len()
         );
+        octocrab::Result::Ok((base_name, pulls, s))
+    }))
+    .await?;
+    let mut base_names = Vec::new();
+    let mut pull_blobs = Vec::new();
+    for (base_name, pulls, s) in hydrated {
         base_names.push(base_name);
         pull_blobs.push((pulls, s));
     }
+    maintenance.await.expect("maintenance task error");
+    // The per-slug fetch and head resolution jobs are network-bound and
+    // write into per-slug ref namespaces, so run the slugs in parallel. Git
+    // takes per-ref locks, which keeps concurrent fetches into the shared
+    // repo safe.
     let mut mono_pulls = Vec::new();
-    for (ps, slug) in pull_blobs {
-        let sl = slug.str();
-        println!("Store diffs for {sl}");
-        util::check_call(
-            util::git()
-                .args(["fetch", "--quiet"])
-                .arg(format!("con_pull_ref/{sl}")),
-        );
-        for p in ps {
-            let num = p.number;
-            mono_pulls.push(MetaPull {
-                pull: p,
-                head_commit: util::check_output(
-                    util::git()
-                        .args(["log", "-1", "--format=%H"])
-                        .arg(format!("upstream-pull/{num}/head")),
-                ),
-                slug: util::Slug {
-                    owner: slug.owner.clone(),
-                    repo: slug.repo.clone(),
-                },
-                slug_num: format!("{sl}/{num}"),
-                merge_commit: None,
+    let monotree = monotree_dir.as_path();
+    std::thread::scope(|scope| {
+        let workers = pull_blobs
+            .into_iter()
+            .map(|(ps, slug)| {
+                scope.spawn(move || {
+                    let sl = slug.str();
+                    println!("Store diffs for {sl}");
+                    // Fetch only the head refs of the open pulls. The full
+                    // refs/pull/* namespace also holds every closed pull, so
+                    // the blanket fetch paid for thousands of refs that are
+                    // never looked at.
+                    for chunk in ps.chunks(1000) {
+                        let mut cmd = util::git_in(monotree);
+                        cmd.args(["fetch", "--quiet", "--no-tags"])
+                            .arg(format!("con_pull_ref/{sl}"));
+                        for p in chunk {
+                            cmd.arg(format!(
+                                "+refs/pull/{num}/head:refs/remotes/upstream-pull/{sl}/{num}/head",
+                                num = p.number
+                            ));
+                        }
+                        util::check_call(&mut cmd);
+                    }
+                    // Resolve all pull heads in one long-lived cat-file
+                    // session instead of spawning one git process per pull.
+                    let batch = ps
+                        .iter()
+                        .map(|p| format!("upstream-pull/{sl}/{num}/head\n", num = p.number))
+                        .collect::<String>();
+                    let resolved = util::check_output_with_input(
+                        util::git_in(monotree).args(["cat-file", "--batch-check=%(objectname)"]),
+                        &batch,
+                    );
+                    assert_eq!(ps.len(), resolved.lines().count());
+                    let mut pulls = Vec::new();
+                    for (p, head_commit) in ps.into_iter().zip(resolved.lines()) {
+                        assert!(!head_commit.ends_with(" missing"), "missing pull head");
+                        let num = p.number;
+                        pulls.push(MetaPull {
+                            pull: p,
+                            head_commit: head_commit.to_string(),
+                            slug: util::Slug {
+                                owner: slug.owner.clone(),
+                                repo: slug.repo.clone(),
+                            },
+                            slug_num: format!("{sl}/{num}"),
+                            merge_commit: None,
+                            changed_paths: Default::default(),
+                        })
+                    }
+                    pulls
+                })
             })
+            .collect::<Vec<_>>();
+        for worker in workers {
+            mono_pulls.extend(worker.join().expect("worker thread error"));
         }
-    }
+    });
     let base_name = base_names.first().expect("no repos given");
     util::check_call(
-        util::git()
+        util::git_in(&monotree_dir)
             .args(["fetch", "--quiet", "origin"])
             .arg(base_name),
     );
 
-    {
-        let temp_git_work_tree_ctx = tempfile::TempDir::new_in(&temp_dir).expect("tempdir error");
-        let temp_git_work_tree = temp_git_work_tree_ctx.path();
+    // Load the persistent pair-result cache and drop entries from older base
+    // commits instead of letting the file grow without bound.
+    let base_commit = util::check_output(
+        util::git_in(&monotree_dir)
+            .args(["rev-parse"])
+            .arg(format!("origin/{base_name}")),
+    );
+    let pair_cache_file = monotree_dir.parent().unwrap().join("pair_cache.json");
+    let cache_err = "cache file error";
+    let mut pair_cache: std::collections::HashMap<String, bool> = if pair_cache_file.is_file() {
+        serde_json::from_reader(std::fs::File::open(&pair_cache_file).expect(cache_err))
+            .expect(cache_err)
+    } else {
+        Default::default()
+    };
+    pair_cache.retain(|k, _| k.starts_with(&format!("{base_commit}/")));
+    let pair_cache = std::sync::Mutex::new(pair_cache);
 
-        util::check_call(
-            std::process::Command::new("cp")
-                .arg("-r")
-                .arg(monotree_dir.join(".git"))
-                .arg(temp_git_work_tree.join(".git")),
+    // The merge-cache refs pin the prepared-merge commits in the object
+    // store. Drop the refs recorded under older base commits, like the pair
+    // cache entries above; otherwise every base advance leaves its merges
+    // reachable forever and the persist repo grows without bound.
+    let keep_prefix = format!("refs/merge-cache/{base_commit}/");
+    let stale_refs = util::check_output(util::git_in(&monotree_dir).args([
+        "for-each-ref",
+        "--format=%(refname)",
+        "refs/merge-cache/",
+    ]))
+    .lines()
+    .filter(|r| !r.starts_with(&keep_prefix))
+    .map(|r| format!("delete {r}\n"))
+    .collect::<String>();
+    if !stale_refs.is_empty() {
+        util::check_output_with_input(
+            util::git_in(&monotree_dir).args(["update-ref", "--stdin"]),
+            &stale_refs,
         );
+    }
+
+    // Remember the id of each pull's metadata comment and the section text
+    // last written to it, so later runs fetch the comment directly instead
+    // of paging through the whole thread, and skip unchanged sections
+    // without any request.
+    let comment_cache_file = monotree_dir.parent().unwrap().join("comment_cache.json");
+    let mut comment_cache: std::collections::HashMap<String, CommentCache> =
+        if comment_cache_file.is_file() {
+            serde_json::from_reader(std::fs::File::open(&comment_cache_file).expect(cache_err))
+                .expect(cache_err)
+        } else {
+            Default::default()
+        };
 
-        util::chdir(temp_git_work_tree);
+    // A pair can only produce a content conflict when the two pulls touch
+    // an overlapping set of files, and most pairs do not. One diff per pull
+    // (N, not N²) feeds the disjointness prefilter in calc_conflicts.
+    println!("Calculate changed files");
+    for p in mono_pulls.iter_mut() {
+        p.changed_paths = util::check_output(
+            util::git_in(&monotree_dir)
+                .args(["diff", "--name-only", "--no-renames"])
+                .arg(format!("{base_commit}...{head}", head = p.head_commit)),
+        )
+        .lines()
+        .map(|l| l.to_string())
+        .collect();
+    }
+
+    {
+        // A persistent detached worktree shares the persist repo's object
+        // store through a gitlink, replacing the copy of the whole .git
+        // directory that every run used to make.
+        let work_tree = monotree_dir.parent().unwrap().join("work");
+        if !work_tree.is_dir() {
+            util::check_call(
+                util::git_in(&monotree_dir)
+                    .args(["worktree", "add", "--detach", "--quiet"])
+                    .arg(&work_tree),
+            );
+        }
+        // Clean up a merge a previous interrupted run may have left behind.
+        util::call(util::git_in(&work_tree).args(["merge", "--abort"]));
         println!("Calculate mergeable pulls");
 
-        let mono_pulls_mergeable = calc_mergeable(mono_pulls, base_name);
+        let mut mono_pulls_mergeable = calc_mergeable(mono_pulls, base_name, &work_tree);
+        // Sweep the pulls with the smallest footprint first: the disjointness
+        // prefilter rejects most of their pairs outright, so the cheap checks
+        // run up front and the batched merges of the wide pulls come last,
+        // when the pair cache is warmest.
+        mono_pulls_mergeable.sort_by_key(|p| p.changed_paths.len());
         if args.update_comments {
-            for (i, pull_update) in mono_pulls_mergeable.iter().enumerate() {
-                println!(
-                    "{i}/{len} Checking for conflicts {base_name} <> {pr_id} <> other_pulls ... ",
-                    len = mono_pulls_mergeable.len(),
-                    pr_id = pull_update.slug_num
-                );
-                let pulls_conflict = calc_conflicts(&mono_pulls_mergeable, pull_update);
-                update_comment(&config, &github, args.dry_run, pull_update, &pulls_conflict)
-                    .await?;
+            // The pair-merges run in-memory on the shared object store, so
+            // they can fan out over all cores without per-worker worktrees.
+            let num_workers = std::thread::available_parallelism()
+                .map(|n| n.get())
+                .unwrap_or(1);
+            let next_idx = std::sync::atomic::AtomicUsize::new(0);
+            let mut results = Vec::new();
+            std::thread::scope(|scope| {
+                let workers = (0..num_workers)
+                    .map(|_| {
+                        scope.spawn(|| {
+                            let mut res = Vec::new();
+                            loop {
+                                let i =
+                                    next_idx.fetch_add(1, std::sync::atomic::Ordering::Relaxed);
+                                if i >= mono_pulls_mergeable.len() {
+                                    break;
+                                }
+                                let pull_update = &mono_pulls_mergeable[i];
+                                println!(
+                                    "{i}/{len} Checking for conflicts {base_name} <> {pr_id} <> other_pulls ... ",
+                                    len = mono_pulls_mergeable.len(),
+                                    pr_id = pull_update.slug_num
+                                );
+                                res.push((i, calc_conflicts(&mono_pulls_mergeable, pull_update, base_name, &base_commit, &pair_cache, &work_tree)));
+                            }
+                            res
+                        })
+                    })
+                    .collect::<Vec<_>>();
+                for worker in workers {
+                    results.extend(worker.join().expect("worker thread error"));
+                }
+            });
+            results.sort_by_key(|(i, _)| *i);
+            for (i, pulls_conflict) in results {
+                update_comment(
+                    &config,
+                    &github,
+                    args.dry_run,
+                    &mono_pulls_mergeable[i],
+                    &pulls_conflict,
+                    &mut comment_cache,
+                )
+                .await?;
             }
         }
         if let Some(pull_id) = args.pull_id {
@@ -356,11 +707,35 @@ async fn main() -> octocrab::Result<()> {
                 "Checking for conflicts {base_name} <> {id} <> other_pulls ... ",
                 id = pull_merge.slug_num
             );
-            let conflicts = calc_conflicts(&mono_pulls_mergeable, pull_merge);
-            update_comment(&config, &github, args.dry_run, pull_merge, &conflicts).await?;
+            let conflicts = calc_conflicts(
+                &mono_pulls_mergeable,
+                pull_merge,
+                base_name,
+                &base_commit,
+                &pair_cache,
+                &work_tree,
+            );
+            update_comment(
+                &config,
+                &github,
+                args.dry_run,
+                pull_merge,
+                &conflicts,
+                &mut comment_cache,
+            )
+            .await?;
         }
     }
-    util::chdir(&temp_dir);
+    serde_json::to_writer(
+        std::fs::File::create(&pair_cache_file).expect(cache_err),
+        &*pair_cache.lock().expect("lock error"),
+    )
+    .expect(cache_err);
+    serde_json::to_writer(
+        std::fs::File::create(&comment_cache_file).expect(cache_err),
+        &comment_cache,
+    )
+    .expect(cache_err);
 
     Ok(())
 }
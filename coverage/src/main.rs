@@ -1,5 +1,21 @@
 use clap::Parser;
-use util::{chdir, check_call, check_output, git};
+use util::{chdir, check_call, check_output, check_output_with_input, git};
+
+fn build_image() -> String {
+    // Bake the apt layer into a local image once. Podman caches the layers,
+    // so later runs skip the package download and install entirely.
+    let tag = "localhost/drahtbot_coverage";
+    let dockerfile = format!(
+        "FROM {base}\nENV LC_ALL=C.UTF-8\nRUN apt-get update && apt-get install -qq {pkgs}\n",
+        base = "ubuntu:lunar", // Use "devel" once and if https://github.com/bitcoin/bitcoin/issues/28468#issuecomment-1790901853 is fixed
+        pkgs = "clang llvm ccache python3-zmq libsqlite3-dev libevent-dev libboost-dev libdb5.3++-dev libminiupnpc-dev libzmq3-dev lcov build-essential libtool autotools-dev automake pkg-config bsdmainutils",
+    );
+    check_output_with_input(
+        std::process::Command::new("podman").args(["build", "--quiet", "--tag", tag, "-"]),
+        &dockerfile,
+    );
+    tag.to_string()
+}
 
 fn gen_coverage(
     docker_exec: &dyn Fn(&str),
@@ -34,7 +50,8 @@ fn gen_coverage(
     docker_exec("./autogen.sh");
     chdir(&dir_build);
 
-    docker_exec("../configure --enable-zmq --with-incompatible-bdb --enable-lcov --enable-lcov-branch-coverage CC=clang CXX=clang++");
+    docker_exec("ccache --max-size=20G");
+    docker_exec("../configure --enable-zmq --with-incompatible-bdb --enable-lcov --enable-lcov-branch-coverage CC='ccache clang' CXX='ccache clang++'");
     docker_exec(&format!("make -j{}", make_jobs));
 
     println!("Make coverage ...");
@@ -54,24 +71,41 @@ fn gen_coverage(
     ]));
     check_call(git().args(["push", "origin", "main"]));
 
-    // Work around permission errors
-    clear_dir(dir_result);
-    chdir(dir_result);
+    // Work around permission errors. A chown plus git clean walks only the
+    // result folder's own files, instead of wiping the tree and checking
+    // every file out again.
+    docker_exec(&format!(
+        "chown -R $(id -u):$(id -g) {}",
+        dir_result.display()
+    ));
+    check_call(git().args(["clean", "-dffx"]));
     check_call(git().args(["reset", "--hard", "HEAD"]));
 }
 
 fn calc_coverage(
     dir_code: &std::path::Path,
     dir_cov_report: &std::path::Path,
+    dir_ccache: &std::path::Path,
     make_jobs: u8,
     remote_url: &str,
 ) {
+    println!("Build container image ...");
+    let image_tag = build_image();
+
     println!("Start docker process ...");
     std::fs::create_dir_all(dir_cov_report).expect("Failed to create dir_cov_report");
+    // The ccache dir lives outside the build dir, so it survives clear_dir
+    // and warms the compile of every later run.
+    std::fs::create_dir_all(dir_ccache).expect("Failed to create dir_ccache");
     let docker_id = check_output(std::process::Command::new("podman").args([
         "run",
         "-idt",
         "--rm",
+        // A fixed name with --replace keeps an interrupted run from piling
+        // up containers: the next run supersedes the leftover one.
+        "--name",
+        "drahtbot_coverage",
+        "--replace",
         &format!(
             "--volume={}:{}:rw,z",
             dir_code.display(),
@@ -82,35 +116,44 @@ fn calc_coverage(
             dir_cov_report.display(),
             dir_cov_report.display()
         ),
+        &format!(
+            "--volume={}:{}:rw,z",
+            dir_ccache.display(),
+            dir_ccache.display()
+        ),
         //'--mount', # Doesn't work with fedora (needs rw,z)
         //'type=bind,src={},dst={}'.format(dir_code, dir_code),
         //'--mount',
         //'type=bind,src={},dst={}'.format(dir_cov_report, dir_cov_report),
         "-e",
         "LC_ALL=C.UTF-8",
-        "ubuntu:lunar", // Use "devel" once and if https://github.com/bitcoin/bitcoin/issues/28468#issuecomment-1790901853 is fixed
+        "-e",
+        &format!("CCACHE_DIR={}", dir_ccache.display()),
+        &image_tag,
     ]));
 
     let docker_exec = |cmd: &str| {
-        check_call(std::process::Command::new("podman").args([
-            "exec",
-            &docker_id,
-            "bash",
-            "-c",
-            &format!(
-                "cd {} && {}",
-                std::env::current_dir().expect("Failed to getcwd").display(),
-                cmd
-            ),
-        ]))
+        // Let podman set the workdir natively instead of spawning a shell
+        // whose only extra job is the cd. The shell itself stays, because
+        // several commands rely on glob expansion.
+        check_call(
+            std::process::Command::new("podman").args([
+                "exec",
+                "-w",
+                &std::env::current_dir()
+                    .expect("Failed to getcwd")
+                    .display()
+                    .to_string(),
+                &docker_id,
+                "bash",
+                "-c",
+                cmd,
+            ]),
+        )
     };
 
     println!("Docker running with id {}.", docker_id);
 
-    println!("Installing packages ...");
-    docker_exec("apt-get update");
-    docker_exec(&format!("apt-get install -qq {}", "clang llvm ccache python3-zmq libsqlite3-dev libevent-dev libboost-dev libdb5.3++-dev libminiupnpc-dev libzmq3-dev lcov build-essential libtool autotools-dev automake pkg-config bsdmainutils"));
-
     println!("Generate coverage");
     chdir(dir_code);
     let base_git_ref = &check_output(git().args(["log", "--format=%H", "-1", "HEAD"]))[..16];
@@ -124,6 +167,9 @@ fn calc_coverage(
     );
 
     println!("{remote_url}/coverage/monotree/{base_git_ref}/total.coverage/index.html");
+
+    println!("Stop docker process ...");
+    check_call(std::process::Command::new("podman").args(["stop", &docker_id]));
 }
 
 #[derive(clap::Parser)]
@@ -155,7 +201,13 @@ struct Args {
 fn ensure_init_git(folder: &std::path::Path, url: &str) {
     println!("Clone {url} repo to {dir}", dir = folder.display());
     if !folder.is_dir() {
-        check_call(git().args(["clone", "--quiet", url]).arg(folder));
+        // A blobless partial clone skips the file contents of the history;
+        // checkouts fault in only the blobs of the commit actually built.
+        check_call(
+            git()
+                .args(["clone", "--quiet", "--filter=blob:none", url])
+                .arg(folder),
+        );
     }
 }
 
@@ -208,6 +260,7 @@ fn main() {
     calc_coverage(
         &code_dir,
         &report_dir.join("coverage").join("monotree"),
+        &temp_dir.join("ccache"),
         args.make_jobs,
         &args.remote_url,
     );
@@ -49,9 +49,11 @@ fn main() -> Result<(), std::io::Error> {
             git_repo_dir.display()
         );
         util::chdir(temp_dir);
+        // A blobless partial clone transfers no historical file contents;
+        // the checkout below faults in only the blobs of the requested ref.
         util::check_call(
             util::git()
-                .args(["clone", "--quiet", &git_remote_url])
+                .args(["clone", "--quiet", "--filter=blob:none", &git_remote_url])
                 .arg(&git_repo_dir),
         );
     }
@@ -71,18 +73,38 @@ fn main() -> Result<(), std::io::Error> {
         source_dir.display(),
         www_folder_depends_caches.display()
     );
-    for entry in std::fs::read_dir(source_dir)? {
-        let entry = entry?;
-        if !entry.path().is_file() {
-            continue;
+    let entries = std::fs::read_dir(source_dir)?
+        .collect::<Result<Vec<_>, _>>()?
+        .into_iter()
+        .filter(|entry| entry.path().is_file())
+        .collect::<Vec<_>>();
+    // The sources are immutable release tarballs, so a destination file of
+    // the same size is already current and needs no copy. The remaining
+    // copies are independent, so spread them over the cores; fs::copy
+    // offloads each one to the kernel.
+    let num_workers = std::thread::available_parallelism()
+        .map(|n| n.get())
+        .unwrap_or(1);
+    let next_idx = std::sync::atomic::AtomicUsize::new(0);
+    std::thread::scope(|scope| {
+        for _ in 0..num_workers {
+            scope.spawn(|| loop {
+                let i = next_idx.fetch_add(1, std::sync::atomic::Ordering::Relaxed);
+                if i >= entries.len() {
+                    break;
+                }
+                let entry = &entries[i];
+                println!(" ... entry = {}", entry.file_name().to_string_lossy());
+                if !args.dry_run {
+                    let target = www_folder_depends_caches.join(entry.file_name());
+                    let size = |m: std::fs::Metadata| m.len();
+                    if target.metadata().map(size).ok() == entry.metadata().map(size).ok() {
+                        continue;
+                    }
+                    std::fs::copy(entry.path(), target).expect("copy error");
+                }
+            });
         }
-        println!(" ... entry = {}", entry.file_name().to_string_lossy());
-        if !args.dry_run {
-            std::fs::copy(
-                entry.path(),
-                www_folder_depends_caches.join(entry.file_name()),
-            )?;
-        }
-    }
+    });
     Ok(())
 }
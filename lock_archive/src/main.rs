@@ -28,6 +28,10 @@ async fn main() -> octocrab::Result<()> {
 
     for util::Slug { owner, repo } in args.github_repo {
         println!("Get closed issues and pull requests for {owner}/{repo} ...");
+        // Collect every page before acting: locking removes the item from
+        // the is:unlocked query, and GitHub re-evaluates the query on each
+        // page fetch, so acting while paginating would shift the remaining
+        // matches and skip items.
         let items = github
             .all_pages(
                 github
@@ -1,9 +1,14 @@
 import mwclient
 import argparse
+import hashlib
+import json
 import os
+import threading
 import time
 import glob
 
+from concurrent.futures import ThreadPoolExecutor
+
 from util.util import get_git, call_git
 
 
@@ -17,10 +22,13 @@ def main():
     parser.add_argument('--dry_run', help='Print changes/edits instead of calling the MediaWiki API.', action='store_true', default=False)
     args = parser.parse_args()
 
-    site = mwclient.Site(host=args.mediawiki_host)
-    if not args.dry_run:
-        login_tuple = args.mediawiki_login_tuple.split(':', 1)
-        site.login(login_tuple[0], login_tuple[1])
+    login_tuple = args.mediawiki_login_tuple.split(':', 1)
+
+    def make_site():
+        site = mwclient.Site(host=args.mediawiki_host)
+        if not args.dry_run:
+            site.login(login_tuple[0], login_tuple[1])
+        return site
 
     args.scratch_dir = os.path.abspath(os.path.join(args.scratch_dir, ''))
     os.makedirs(args.scratch_dir, exist_ok=True)
@@ -33,34 +41,81 @@ def main():
             return
         print('Clone {} repo to {}'.format(url, folder))
         os.chdir(args.scratch_dir)
-        call_git(['clone', '--quiet', url, folder])
+        # Only the current mediawiki files are ever read, so skip the history
+        # and the other blobs entirely.
+        call_git(['clone', '--quiet', '--depth=1', '--filter=blob:none', '--no-checkout', url, folder])
+        os.chdir(folder)
+        call_git(['sparse-checkout', 'set', '--no-cone', 'bip-*.mediawiki'])
+        call_git(['checkout', '--quiet', 'master'])
 
     create_scratch_dir(code_dir, code_url)
 
     print('Fetching diffs ...')
     os.chdir(code_dir)
-    call_git(['fetch', '--quiet', '--all'])
-    call_git(['reset', '--hard', 'HEAD'])
-    call_git(['checkout', 'master'])
-    call_git(['pull', '--ff-only', 'origin', 'master'])
+    call_git(['fetch', '--quiet', '--depth=1', 'origin', 'master'])
+    call_git(['reset', '--hard', 'origin/master'])
 
     commit_id = get_git(['log', '-1', '--format=%H'])[:16]
-    for file_name in glob.glob('bip-*.mediawiki'):
+
+    # The wiki throttles edits per user, not per connection, so workers can
+    # overlap the network round-trips as long as a shared limiter keeps the
+    # overall edit rate fixed.
+    edit_lock = threading.Lock()
+    last_edit = [0.0]
+
+    def throttle():
+        with edit_lock:
+            wait = last_edit[0] + 2 - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            last_edit[0] = time.time()
+
+    # Remember the hash of the text uploaded for each file, so unchanged BIPs
+    # skip even the page fetch on later runs.
+    cache_file = os.path.join(args.scratch_dir, 'upload_cache.json')
+    upload_cache = {}
+    if os.path.isfile(cache_file):
+        with open(cache_file, encoding='utf-8') as f:
+            upload_cache = json.load(f)
+    cache_lock = threading.Lock()
+
+    local = threading.local()
+
+    def upload_bip(file_name):
+        if not hasattr(local, 'site'):
+            local.site = make_site()
+        site = local.site
         bip_number = int(file_name.split('bip-', 1)[1].split('.mediawiki')[0])
         print('Reading BIP {:04d} ...'.format(bip_number))
         with open(file_name, encoding='utf-8') as f:
             content = f.read()
+        new_text = '{{bip}}\n' + '{{BipMoved|' + file_name + '}}\n\n' + content
+        digest = hashlib.sha256(new_text.encode()).hexdigest()
+        if upload_cache.get(file_name) == digest:
+            print('... unchanged since last upload, skip')
+            return
         page = site.pages['BIP {:04d}'.format(bip_number)]
         edit_summary = 'Update BIP text with latest version from {}/blob/{}/{}'.format(code_url, commit_id, file_name)
         print(edit_summary)
         if not args.dry_run:
-            page.save('{{bip}}\n' + '{{BipMoved|' + file_name + '}}\n\n' + content, edit_summary)
-            time.sleep(5)
-            site.pages['bip-{:04d}.mediawiki'.format(bip_number)].save(
-                '#REDIRECT [[BIP {:04d}]]'.format(bip_number),
-                'Create redirect from [[bip-{:04d}.mediawiki]] to [[BIP {:04d}]]'.format(bip_number, bip_number),
-            )
-            time.sleep(5)
+            # The page may already hold the latest text (e.g. after a cache
+            # loss); don't re-save identical content.
+            if page.text() != new_text:
+                throttle()
+                page.save(new_text, edit_summary)
+                throttle()
+                site.pages['bip-{:04d}.mediawiki'.format(bip_number)].save(
+                    '#REDIRECT [[BIP {:04d}]]'.format(bip_number),
+                    'Create redirect from [[bip-{:04d}.mediawiki]] to [[BIP {:04d}]]'.format(bip_number, bip_number),
+                )
+            with cache_lock:
+                upload_cache[file_name] = digest
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(upload_bip, sorted(glob.glob('bip-*.mediawiki'))))
+
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump(upload_cache, f)
 
 
 if __name__ == '__main__':
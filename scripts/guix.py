@@ -1,5 +1,9 @@
 from github import Github, GithubException
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 import platform
+import errno
 import time
 import itertools
 import shutil
@@ -19,15 +23,47 @@ UPSTREAM_PULL = 'upstream-pull'
 CURRENT_XCODE_FILENAME = "Xcode-15.0-15A240d-extracted-SDK-with-libcxx-headers.tar.gz"
 
 
+def move_fast(src, dst):
+    # A rename publishes the folder atomically and without touching the
+    # artifact bytes. When the www folder sits on another filesystem, link
+    # the artifacts over instead and only fall back to copying where
+    # hardlinks are refused.
+    try:
+        os.rename(src, dst)
+        return dst
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    os.makedirs(dst, exist_ok=True)
+    for f in os.listdir(src):
+        s = os.path.join(src, f)
+        d = os.path.join(dst, f)
+        if os.path.isdir(s):
+            # The flattening in call_guix_build is best-effort, so nested
+            # dirs can survive into the output folder.
+            move_fast(s, d)
+        else:
+            try:
+                os.link(s, d)
+            except OSError:
+                shutil.copy2(s, d)
+    shutil.rmtree(src, ignore_errors=True)
+    return dst
+
+
 def calculate_diffs(folder_1, folder_2):
     EXTENSIONS = ['.log']
     files = set(os.listdir(folder_1)).intersection(set(os.listdir(folder_2)))
     files = [f for f in files if any(f.endswith(e) for e in EXTENSIONS)]
+    # The diffs are independent, so start them all at once and let the
+    # kernel overlap the file reads, then collect the exit codes.
+    procs = []
     for f in files:
-        os.chdir(folder_2)
         file_1 = str(os.path.join(folder_1, f))
         file_2 = str(os.path.join(folder_2, f))
-        subprocess.call('diff --color {} {} > {}.diff'.format(file_1, file_2, f), shell=True)
+        procs.append(subprocess.Popen('diff --color {} {} > {}.diff'.format(file_1, file_2, f), shell=True, cwd=folder_2))
+    for p in procs:
+        p.wait()
 
 
 def main():
@@ -38,6 +74,7 @@ def main():
     parser.add_argument('--base_name', help='The name of the base branch.', default='master')
     parser.add_argument('--guix_folder', help='The local scratch folder for temp guix results', default=os.path.join(THIS_FILE_PATH, '..', 'scratch', 'guix'))
     parser.add_argument('--guix_jobs', help='The number of jobs', default=2)
+    parser.add_argument('--build_workers', help='The number of parallel build workers. Each worker runs its own docker container with its own git clone and guix store.', default=1)
     parser.add_argument('--domain', help='Where the assets are reachable', default='http://127.0.0.1')
     parser.add_argument('--dry_run', help='Print changes/edits instead of calling the GitHub API.', action='store_true', default=False)
     parser.add_argument('--build_one_commit', help='Only build this one commit and exit.', default='')
@@ -59,132 +96,188 @@ def main():
         guix_www_folder = os.path.join(temp_dir, 'www_output')
     else:
         print('Clean guix folder of old files')
-        subprocess.check_call('find {} -mindepth 1 -maxdepth 1 -type d -ctime +{} | xargs rm -rf'.format(guix_www_folder, 15), shell=True)
+        # Walk the folder in-process instead of spawning sh, find, xargs and
+        # one rm per stale dir; the rmtrees are unlink-latency-bound, so run
+        # them on the pool.
+        cutoff = time.time() - 15 * 24 * 3600
+        if os.path.isdir(guix_www_folder):
+            with os.scandir(guix_www_folder) as it:
+                stale = [e.path for e in it if e.is_dir(follow_symlinks=False) and e.stat().st_ctime < cutoff]
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+                list(ex.map(lambda p: shutil.rmtree(p, ignore_errors=True), stale))
 
     os.makedirs(guix_www_folder, exist_ok=True)
 
-    git_repo_dir = os.path.join(temp_dir, args.github_repo)
     depends_sources_dir = os.path.join(temp_dir, 'depends_sources')
-    depends_cache_dir = os.path.join(temp_dir, 'depends_cache')
-    guix_store_dir = os.path.join(temp_dir, 'root_store')
-    guix_bin_dir = os.path.join(temp_dir, 'root_bin')
     os.makedirs(depends_sources_dir, exist_ok=True)
-    os.makedirs(depends_cache_dir, exist_ok=True)
-    os.makedirs(guix_store_dir, exist_ok=True)
-    os.makedirs(guix_bin_dir, exist_ok=True)
-
-    if not os.path.isdir(git_repo_dir):
-        print('Clone {} repo to {}'.format(url, git_repo_dir))
-        os.chdir(temp_dir)
-        call_git(['clone', '--quiet', url, git_repo_dir])
-        print('Set git metadata')
-        os.chdir(git_repo_dir)
-        with open(os.path.join(git_repo_dir, '.git', 'config'), 'a') as f:
-            f.write('[remote "{}"]\n'.format(UPSTREAM_PULL))
-            f.write('    url = {}\n'.format(url))
-            f.write('    fetch = +refs/pull/*:refs/remotes/upstream-pull/*\n')
-            f.flush()
-
-    print('Start docker process ...')
-    docker_id = subprocess.check_output(
-        [
-            'docker',
-            'run',
-            '-idt',
-            '--rm',
-            '--privileged',  # https://github.com/bitcoin/bitcoin/pull/17595#issuecomment-606407804
-            '--volume={}:{}:rw,z'.format(guix_store_dir, '/gnu'),
-            '--volume={}:{}:rw,z'.format(guix_bin_dir, '/var/guix'),
-            '--volume={}:{}:rw,z'.format(temp_dir, temp_dir),
-            #'--mount', # Doesn't work with fedora (needs rw,z)
-            #'type=bind,src={},dst={}'.format(dir_code, dir_code),
-            #'-e',
-            #'LC_ALL=C.UTF-8',
-            'ubuntu:noble',
-        ],
-        universal_newlines=True,
-    ).strip()
-
-    print('Docker running with id {}.'.format(docker_id))
-    docker_bash_prefix = ['true']
-
-    def docker_exec(cmd, *, ignore_ret_code=False):
-        scall = subprocess.call if ignore_ret_code else subprocess.check_call
-        scall(['docker', 'exec', docker_id, 'bash', '-c', 'export FORCE_DIRTY_WORKTREE=1 && export TMPDIR=/guix_temp_dir/ && {} && cd {} && {}'.format(docker_bash_prefix[0], os.getcwd(), cmd)], universal_newlines=True)
-
-    docker_exec('mkdir /guix_temp_dir/')
-
-    print('Installing packages ...')
-    docker_exec('apt-get update')
-    docker_exec('apt-get install -qq {}'.format('netbase wget xz-utils git make curl'))
-
-    print('Fetch upsteam pulls')
-    os.chdir(git_repo_dir)
-    docker_exec("git fetch --quiet --all")
-
-    os.chdir(temp_dir)
-    if not os.listdir(guix_store_dir):
-        print('Install guix')
-        docker_exec("wget https://ftp.gnu.org/gnu/guix/guix-binary-1.4.0.x86_64-linux.tar.xz")
-        docker_exec('echo "236ca7c9c5958b1f396c2924fcc5bc9d6fdebcb1b4cf3c7c6d46d4bf660ed9c9  ./guix-binary-1.4.0.x86_64-linux.tar.xz" | sha256sum -c')
-        docker_exec("tar -xf ./guix-binary-1.4.0.x86_64-linux.tar.xz")
-        docker_exec("mv var/guix/* /var/guix && mv gnu/* /gnu/")
-
-    docker_exec('mkdir -p /config_guix/')
-    docker_exec('ls -lh /config_guix/')
-    docker_exec('ln -sf /var/guix/profiles/per-user/root/current-guix /config_guix/current')
-    docker_bash_prefix[0] = 'source /config_guix/current/etc/profile'
-    docker_exec('groupadd --system guixbuild')
-    docker_exec('for i in `seq -w 1 10`; do useradd -g guixbuild -G guixbuild -d /var/empty -s `which nologin` -c "Guix build user $i" --system guixbuilder$i; done')
-
-    docker_exec('guix archive --authorize < /config_guix/current/share/guix/ci.guix.info.pub')
-
-    def call_guix_build(*, commit):
-        os.chdir(git_repo_dir)
-        docker_exec("chown -R root:root ./")
-        docker_exec("git clean -dfx")
-        docker_exec("git checkout --quiet --force {}".format(commit))
-        depends_compiler_hash = get_git(['rev-parse', '{}:./contrib/guix'.format(commit)])
-        depends_cache_subdir = os.path.join(depends_cache_dir, depends_compiler_hash)
-        docker_exec(f"cp -r {depends_cache_subdir}/built {git_repo_dir}/depends/", ignore_ret_code=True)
-        docker_exec("mkdir -p {}/depends/SDKs/".format(git_repo_dir))
-        shutil.copy(src=os.path.join(THIS_FILE_PATH, CURRENT_XCODE_FILENAME), dst=temp_dir)
-        docker_exec(f"tar -xf {temp_dir}/{CURRENT_XCODE_FILENAME} --directory {git_repo_dir}/depends/SDKs/")
-        docker_exec("sed -i -e 's/--disable-bench //g' $(git grep -l disable-bench ./contrib/guix/)")
-        docker_exec("sed -i '/ x86_64-w64-mingw32$/d' ./contrib/guix/guix-build")  # For now, until guix 1.5
-        docker_exec(f"( guix-daemon --build-users-group=guixbuild & (export V=1 && export VERBOSE=1 && export MAX_JOBS={args.guix_jobs} && export SOURCES_PATH={depends_sources_dir} && ./contrib/guix/guix-build > {git_repo_dir}/outerr 2>&1 ) && kill %1 )", ignore_ret_code=True)
-        docker_exec("rm -rf {}/*".format(depends_cache_dir))
-        os.makedirs(depends_cache_subdir, exist_ok=True)
-        docker_exec(f"mv {git_repo_dir}/depends/built {depends_cache_subdir}/built")
-        output_dir = os.path.join(git_repo_dir, 'guix-build-output')
-        docker_exec(f"mv {git_repo_dir}/guix-build-*/output {output_dir}")
-        docker_exec(f"mv {git_repo_dir}/outerr {output_dir}/guix_build.log")
-        docker_exec(f"for i in {output_dir}/* ; do mv $i/* {output_dir}/ ; done", ignore_ret_code=True)
-        docker_exec(f"for i in {output_dir}/* ; do rmdir $i ; done", ignore_ret_code=True)
-        return output_dir
+
+    # Stage the SDK archive once, before any workers start. The staging path
+    # is shared between the workers, and copying it per build would truncate
+    # the file while another worker may be mid-extraction.
+    shutil.copy(src=os.path.join(THIS_FILE_PATH, CURRENT_XCODE_FILENAME), dst=temp_dir)
+
+    def publish_results(build, *, commit):
+        # Skip the long rebuild when the results for this commit are already
+        # published. The sentinel is written only after a complete move, so a
+        # half-published folder from an interrupted run is rebuilt; the
+        # 15-day www cleanup drops the folder and the sentinel together.
+        target = os.path.join(guix_www_folder, commit)
+        sentinel = os.path.join(target, '.done')
+        if os.path.exists(sentinel):
+            print('Reuse previous results for {}'.format(commit))
+            return target
+        folder = build()
+        print('Moving results of {} to {}'.format(folder, guix_www_folder))
+        shutil.rmtree(target, ignore_errors=True)
+        folder = move_fast(src=folder, dst=target)
+        open(sentinel, 'w').close()
+        return folder
+
+    def setup_builder(worker):
+        # One docker container with its own git clone, guix store, and
+        # depends cache. The guix daemon locks its store, so workers can not
+        # share one. Worker 0 keeps the plain folder names of previous
+        # versions to reuse their scratch state.
+        suffix = '_{}'.format(worker) if worker else ''
+        git_repo_dir = os.path.join(temp_dir, args.github_repo + suffix)
+        depends_cache_dir = os.path.join(temp_dir, 'depends_cache' + suffix)
+        guix_store_dir = os.path.join(temp_dir, 'root_store' + suffix)
+        guix_bin_dir = os.path.join(temp_dir, 'root_bin' + suffix)
+        os.makedirs(depends_cache_dir, exist_ok=True)
+        os.makedirs(guix_store_dir, exist_ok=True)
+        os.makedirs(guix_bin_dir, exist_ok=True)
+
+        if not os.path.isdir(git_repo_dir):
+            print('Clone {} repo to {}'.format(url, git_repo_dir))
+            # A blobless clone only downloads the commit and tree history;
+            # the blobs of a build's tree are fetched on checkout.
+            call_git(['clone', '--quiet', '--filter=blob:none', url, git_repo_dir], cwd=temp_dir)
+            print('Set git metadata')
+            with open(os.path.join(git_repo_dir, '.git', 'config'), 'a') as f:
+                f.write('[remote "{}"]\n'.format(UPSTREAM_PULL))
+                f.write('    url = {}\n'.format(url))
+                f.write('    fetch = +refs/pull/*:refs/remotes/upstream-pull/*\n')
+                f.flush()
+
+        print('Start docker process ...')
+        docker_id = subprocess.check_output(
+            [
+                'docker',
+                'run',
+                '-idt',
+                '--rm',
+                '--privileged',  # https://github.com/bitcoin/bitcoin/pull/17595#issuecomment-606407804
+                '--volume={}:{}:rw,z'.format(guix_store_dir, '/gnu'),
+                '--volume={}:{}:rw,z'.format(guix_bin_dir, '/var/guix'),
+                '--volume={}:{}:rw,z'.format(temp_dir, temp_dir),
+                #'--mount', # Doesn't work with fedora (needs rw,z)
+                #'type=bind,src={},dst={}'.format(dir_code, dir_code),
+                #'-e',
+                #'LC_ALL=C.UTF-8',
+                'ubuntu:noble',
+            ],
+            universal_newlines=True,
+        ).strip()
+
+        print('Docker running with id {}.'.format(docker_id))
+        docker_bash_prefix = ['true']
+
+        def docker_exec(cmd, *, cwd, ignore_ret_code=False):
+            scall = subprocess.call if ignore_ret_code else subprocess.check_call
+            scall(['docker', 'exec', docker_id, 'bash', '-c', 'export FORCE_DIRTY_WORKTREE=1 && export TMPDIR=/guix_temp_dir/ && {} && cd {} && {}'.format(docker_bash_prefix[0], cwd, cmd)], universal_newlines=True)
+
+        docker_exec('mkdir /guix_temp_dir/', cwd=temp_dir)
+
+        print('Installing packages ...')
+        docker_exec('apt-get update', cwd=temp_dir)
+        docker_exec('apt-get install -qq {}'.format('netbase wget xz-utils git make curl'), cwd=temp_dir)
+
+        print('Fetch upsteam pulls')
+        # Only the two configured remotes are needed; --multiple fetches
+        # them in one git invocation with concurrent negotiations.
+        docker_exec('git fetch --quiet --jobs=2 --multiple origin {}'.format(UPSTREAM_PULL), cwd=git_repo_dir)
+
+        if not os.listdir(guix_store_dir):
+            print('Install guix')
+            docker_exec("wget https://ftp.gnu.org/gnu/guix/guix-binary-1.4.0.x86_64-linux.tar.xz", cwd=temp_dir)
+            docker_exec('echo "236ca7c9c5958b1f396c2924fcc5bc9d6fdebcb1b4cf3c7c6d46d4bf660ed9c9  ./guix-binary-1.4.0.x86_64-linux.tar.xz" | sha256sum -c', cwd=temp_dir)
+            docker_exec("tar -xf ./guix-binary-1.4.0.x86_64-linux.tar.xz", cwd=temp_dir)
+            docker_exec("mv var/guix/* /var/guix && mv gnu/* /gnu/", cwd=temp_dir)
+
+        docker_exec('mkdir -p /config_guix/', cwd=temp_dir)
+        docker_exec('ls -lh /config_guix/', cwd=temp_dir)
+        docker_exec('ln -sf /var/guix/profiles/per-user/root/current-guix /config_guix/current', cwd=temp_dir)
+        docker_bash_prefix[0] = 'source /config_guix/current/etc/profile'
+        docker_exec('groupadd --system guixbuild', cwd=temp_dir)
+        docker_exec('for i in `seq -w 1 10`; do useradd -g guixbuild -G guixbuild -d /var/empty -s `which nologin` -c "Guix build user $i" --system guixbuilder$i; done', cwd=temp_dir)
+
+        docker_exec('guix archive --authorize < /config_guix/current/share/guix/ci.guix.info.pub', cwd=temp_dir)
+
+        def call_guix_build(*, commit):
+            docker_exec("chown -R root:root ./", cwd=git_repo_dir)
+            docker_exec("git clean -dfx", cwd=git_repo_dir)
+            docker_exec("git checkout --quiet --force {}".format(commit), cwd=git_repo_dir)
+            depends_compiler_hash = get_git(['rev-parse', '{}:./contrib/guix'.format(commit)], cwd=git_repo_dir)
+            depends_cache_subdir = os.path.join(depends_cache_dir, depends_compiler_hash)
+            docker_exec(f"cp -r {depends_cache_subdir}/built {git_repo_dir}/depends/", cwd=git_repo_dir, ignore_ret_code=True)
+            docker_exec("mkdir -p {}/depends/SDKs/".format(git_repo_dir), cwd=git_repo_dir)
+            docker_exec(f"tar -xf {temp_dir}/{CURRENT_XCODE_FILENAME} --directory {git_repo_dir}/depends/SDKs/", cwd=git_repo_dir)
+            docker_exec("sed -i -e 's/--disable-bench //g' $(git grep -l disable-bench ./contrib/guix/)", cwd=git_repo_dir)
+            docker_exec("sed -i '/ x86_64-w64-mingw32$/d' ./contrib/guix/guix-build", cwd=git_repo_dir)  # For now, until guix 1.5
+            docker_exec(f"( guix-daemon --build-users-group=guixbuild & (export V=1 && export VERBOSE=1 && export MAX_JOBS={args.guix_jobs} && export SOURCES_PATH={depends_sources_dir} && ./contrib/guix/guix-build > {git_repo_dir}/outerr 2>&1 ) && kill %1 )", cwd=git_repo_dir, ignore_ret_code=True)
+            docker_exec("rm -rf {}/*".format(depends_cache_dir), cwd=git_repo_dir)
+            os.makedirs(depends_cache_subdir, exist_ok=True)
+            docker_exec(f"mv {git_repo_dir}/depends/built {depends_cache_subdir}/built", cwd=git_repo_dir)
+            output_dir = os.path.join(git_repo_dir, 'guix-build-output')
+            docker_exec(f"mv {git_repo_dir}/guix-build-*/output {output_dir}", cwd=git_repo_dir)
+            docker_exec(f"mv {git_repo_dir}/outerr {output_dir}/guix_build.log", cwd=git_repo_dir)
+            docker_exec(f"for i in {output_dir}/* ; do mv $i/* {output_dir}/ ; done", cwd=git_repo_dir, ignore_ret_code=True)
+            docker_exec(f"for i in {output_dir}/* ; do rmdir $i ; done", cwd=git_repo_dir, ignore_ret_code=True)
+            return output_dir
+
+        return SimpleNamespace(
+            git_repo_dir=git_repo_dir,
+            docker_exec=docker_exec,
+            call_guix_build=call_guix_build,
+        )
+
+    builders = [setup_builder(w) for w in range(int(args.build_workers))]
+    builder = builders[0]
 
     if args.build_one_commit:
         print('Starting guix build for one commit ({}) ...'.format(args.build_one_commit))
-        output_dir = call_guix_build(commit=args.build_one_commit)
+        output_dir = builder.call_guix_build(commit=args.build_one_commit)
         print('See folder:\n{}'.format(output_dir))
         print('Exit')
         return
 
-    github_api = Github(args.github_access_token)
+    # Back off on rate-limit or transient server errors instead of falling
+    # over mid-iteration. Retry-After headers are honored by urllib3.
+    github_api = Github(args.github_access_token, retry=Retry(total=5, backoff_factor=2, status_forcelist=[403, 429, 500, 502, 503, 504]))
     github_repo = github_api.get_repo(args.github_repo)
 
     label_needs_guix = github_repo.get_label('DrahtBot Guix build requested')
 
     print('Get open, mergeable {} pulls ...'.format(args.base_name))
-    pulls = return_with_pull_metadata(lambda: [p for p in github_repo.get_pulls(state='open', base=args.base_name)])
-    os.chdir(git_repo_dir)
-    docker_exec("git fetch --quiet --all")  # Do it again just to be safe
-    docker_exec("git fetch --quiet origin")
-    base_commit = get_git(['log', '-1', '--format=%H', 'origin/{}'.format(args.base_name)])
-    pulls = [p for p in pulls if p.mergeable]
-
-    pulls = [p.as_issue() for p in pulls]
-    pulls = [i for i in pulls if label_needs_guix in i.get_labels()]
+    pulls, mergeable = return_with_pull_metadata(lambda: [p for p in github_repo.get_pulls(state='open', base=args.base_name)], cache_file=os.path.join(temp_dir, 'pull_metadata.json'))
+    for b in builders:
+        # Fetch again to pick up pushes that happened while waiting for the
+        # pull metadata.
+        b.docker_exec('git fetch --quiet --jobs=2 --multiple origin {}'.format(UPSTREAM_PULL), cwd=b.git_repo_dir)
+    base_commit = get_git(['rev-parse', 'origin/{}'.format(args.base_name)], cwd=builder.git_repo_dir)
+    # One for-each-ref resolves every merge ref up front, instead of forking
+    # a git process per pull to read a single ref. All clones fetched the
+    # same remote, so the builder's clone answers for all workers.
+    merge_of = {}
+    for line in get_git(['for-each-ref', '--format=%(refname) %(objectname)', 'refs/remotes/{}/*/merge'.format(UPSTREAM_PULL)], cwd=builder.git_repo_dir).splitlines():
+        refname, objectname = line.split()
+        merge_of[int(refname.split('/')[-2])] = objectname
+    pulls = [p for p in pulls if mergeable[p.number]]
+
+    # One server-side filtered listing replaces a get_labels round-trip per
+    # pull.
+    labeled = {i.number for i in github_repo.get_issues(state='open', labels=[label_needs_guix])}
+    pulls = [p.as_issue() for p in pulls if p.number in labeled]
     if not pulls:
         print('Nothing tagged with {}. Exiting...'.format(label_needs_guix.name))
         return
@@ -192,23 +285,18 @@ def main():
     print('Num: {}'.format(len(pulls)))
 
     print('Starting guix build for base branch ...')
-    base_folder = call_guix_build(commit=base_commit)
-
-    print('Moving results of {} to {}'.format(base_folder, guix_www_folder))
-    shutil.rmtree(os.path.join(guix_www_folder, base_commit), ignore_errors=True)
-    base_folder = shutil.move(src=base_folder, dst=os.path.join(guix_www_folder, base_commit))
-
-    for i, p in enumerate(pulls):
-        print('{}/{}'.format(i, len(pulls)))
-
+    base_folder = publish_results(lambda: builder.call_guix_build(commit=base_commit), commit=base_commit)
+
+    def build_and_render(b, p):
+        # Build and render only. The comment and label writes happen on the
+        # main thread after the workers join, since the workers share one
+        # PyGithub client and its Requester is not thread-safe.
+        commit = merge_of.get(p.number)
+        if commit is None:
+            print('No merge commit for pull {}. Skipping ...'.format(p.number))
+            return None
         print('Starting guix build ...')
-        os.chdir(git_repo_dir)
-        commit = get_git(['log', '-1', '--format=%H', '{}/{}/merge'.format(UPSTREAM_PULL, p.number)])
-        commit_folder = call_guix_build(commit=commit)
-
-        print('Moving results of {} to {}'.format(commit, guix_www_folder))
-        shutil.rmtree(os.path.join(guix_www_folder, commit), ignore_errors=True)
-        commit_folder = shutil.move(src=commit_folder, dst=os.path.join(guix_www_folder, commit))
+        commit_folder = publish_results(lambda: b.call_guix_build(commit=commit), commit=commit)
 
         calculate_diffs(base_folder, commit_folder)
 
@@ -223,6 +311,25 @@ def main():
 
         text += calculate_table(base_folder, commit_folder, external_url, base_commit, commit)
 
+        return p, text
+
+    def build_pulls(b, my_pulls):
+        results = []
+        for i, p in enumerate(my_pulls):
+            print('{}/{}'.format(i, len(my_pulls)))
+            results.append(build_and_render(b, p))
+        return results
+
+    results = []
+    with ThreadPoolExecutor(max_workers=len(builders)) as executor:
+        futures = [executor.submit(build_pulls, b, pulls[w::len(builders)]) for w, b in enumerate(builders)]
+        for f in futures:
+            results += f.result()
+
+    for result in results:
+        if result is None:
+            continue
+        p, text = result
         print('{}\n    .remove_from_labels({})'.format(p, label_needs_guix))
         print('    .create_comment({})'.format(text))
 
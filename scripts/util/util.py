@@ -1,45 +1,92 @@
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
+import mmap
 import re
 import os
 import subprocess
+import time
 
-def return_with_pull_metadata(get_pulls):
+def return_with_pull_metadata(get_pulls, *, max_tries=10, cache_file=None):
+    # Returns (pulls, mergeable state by pull number). The optional on-disk
+    # cache is keyed by the pull's updated_at, so pulls untouched since the
+    # previous run skip the per-pull mergeable lookup entirely.
     pulls = get_pulls()
-    pulls_update_mergeable = lambda: [p for p in pulls if p.mergeable is None and not p.merged]
     print('Fetching open pulls metadata ...')
-    while pulls_update_mergeable():
-        print('Update mergable state for pulls {}'.format([p.number for p in pulls_update_mergeable()]))
-        [p.update() for p in pulls_update_mergeable()]
-        pulls = get_pulls()
-    return pulls
+    cache = {}
+    if cache_file and os.path.isfile(cache_file):
+        with open(cache_file, encoding='utf-8') as f:
+            cache = json.load(f)
+    mergeable = {}
+    unknown = []
+    for p in pulls:
+        entry = cache.get(str(p.number))
+        if entry is not None and entry['updated_at'] == p.updated_at.isoformat():
+            mergeable[p.number] = entry['mergeable']
+        else:
+            unknown.append(p)
+    # GitHub computes the mergeable state lazily and the first lookup starts
+    # the computation. Re-fetch only the pulls whose state is still unknown,
+    # a bounded number of times, instead of re-listing everything until all
+    # states settle.
+    for _ in range(max_tries):
+        pulls_update = [p for p in unknown if p.mergeable is None and not p.merged]
+        if not pulls_update:
+            break
+        print('Update mergable state for pulls {}'.format([p.number for p in pulls_update]))
+        time.sleep(3)
+        for p in pulls_update:
+            p.update()
+    for p in unknown:
+        mergeable[p.number] = bool(p.mergeable)
+    if cache_file:
+        with open(cache_file, 'w', encoding='utf-8') as f:
+            json.dump({str(p.number): {'updated_at': p.updated_at.isoformat(), 'mergeable': mergeable[p.number]} for p in pulls}, f)
+    return pulls, mergeable
+
+
+def sha256_digest(path):
+    # Hash in-process: hashlib routes through OpenSSL, which picks the SHA
+    # extensions of the host CPU, and the mmap hands the whole file to it
+    # without chunked reads through Python buffers.
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, prot=mmap.PROT_READ) as mm:
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+                h.update(mm)
+    return h.hexdigest()
 
 
 def calculate_table(base_folder, commit_folder, external_url, base_commit, commit):
-    rows = defaultdict(lambda: ['', ''])  # map from abbrev file name to list of links
-    for f in sorted(os.listdir(base_folder)):
-        short_file_name = re.sub(r'(bitcoin-)?[a-f0-9]{12}', '*', f)
-        os.chdir(base_folder)
-        left = rows[short_file_name]
-        left[0] = '[`{}...`]({}{}/{})'.format(subprocess.check_output(['sha256sum', f], universal_newlines=True)[:16], external_url, base_commit, f)
-        rows[short_file_name] = left
-
-    for f in sorted(os.listdir(commit_folder)):
-        short_file_name = re.sub(r'(bitcoin-)?[a-f0-9]{12}', '*', f)
-        os.chdir(commit_folder)
-        right = rows[short_file_name]
-        right[1] = '[`{}...`]({}{}/{})'.format(subprocess.check_output(['sha256sum', f], universal_newlines=True)[:16], external_url, commit, f)
-        rows[short_file_name] = right
-
-    text = ''
-    for f in rows:
-        text += '| {} | {} | {} |\n'.format(f, rows[f][0], rows[f][1])
-    text += '\n'
-    return text
+    # Map from abbrev file name to one link per column. The abbreviation is
+    # what pairs the columns up: the raw names embed the commit hash and
+    # never match across the two folders.
+    rows = {}
+    for column, folder, commit_id in ((0, base_folder, base_commit), (1, commit_folder, commit)):
+        # Skip bookkeeping files such as the .done publish sentinel.
+        files = sorted(f for f in os.listdir(folder) if not f.startswith('.'))
+        if not files:
+            continue
+        # hashlib releases the GIL while digesting, so hashing the artifacts
+        # on a thread per core scales with the disk and the hash units.
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            hashes = ex.map(lambda f: sha256_digest(os.path.join(folder, f)), files)
+        for f, digest in zip(files, hashes):
+            short_file_name = re.sub(r'(bitcoin-)?[a-f0-9]{12}', '*', f)
+            rows.setdefault(short_file_name, ['', ''])[column] = '[`{}...`]({}{}/{})'.format(digest[:16], external_url, commit_id, f)
+
+    return ''.join('| {} | {} | {} |\n'.format(f, left, right) for f, (left, right) in rows.items()) + '\n'
 
 
 def call_git(args, **kwargs):
+    # git does not care about inherited fds. Leaving them open skips the
+    # per-spawn fd cleanup and lets subprocess use its posix_spawn fast
+    # path instead of fork+exec for the calls that pass no cwd.
+    kwargs.setdefault('close_fds', False)
     subprocess.check_call(['git'] + args, **kwargs)
 
 
-def get_git(args):
-    return subprocess.check_output(['git'] + args, universal_newlines=True).strip()
+def get_git(args, **kwargs):
+    kwargs.setdefault('close_fds', False)
+    return subprocess.check_output(['git'] + args, universal_newlines=True, **kwargs).strip()
@@ -18,11 +18,24 @@ struct Args {
     /// The path to the yaml config file.
     #[arg(long)]
     config_file: std::path::PathBuf,
+    /// The path to a json file caching the mergeable state per pull head.
+    #[arg(long)]
+    cache_file: Option<std::path::PathBuf>,
     /// Print changes/edits instead of calling the GitHub API.
     #[arg(long, default_value_t = false)]
     dry_run: bool,
 }
 
+/// The mergeable state observed for a pull head on a previous run. The state
+/// is deterministic in the head and base commits, so it can be reused as long
+/// as both are unchanged.
+#[derive(serde::Serialize, serde::Deserialize)]
+struct CacheEntry {
+    head: String,
+    base: String,
+    mergeable: bool,
+}
+
 #[derive(serde::Deserialize)]
 struct Config {
     inactive_rebase_days: i64,
@@ -57,6 +70,10 @@ async fn inactive_rebase(
             label = config.needs_rebase_label,
             cutoff = cutoff
         );
+        // Collect every page before acting: the comment below bumps the
+        // pull's updated time out of the search window, and GitHub
+        // re-evaluates the query on each page fetch, so acting while
+        // paginating would shift the remaining matches and skip items.
         let items = github
             .all_pages(
                 github
@@ -109,6 +126,7 @@ async fn inactive_ci(
             label = config.ci_failed_label,
             cutoff = cutoff
         );
+        // Collect every page before acting; see inactive_rebase.
         let items = github
             .all_pages(
                 github
@@ -164,6 +182,7 @@ async fn inactive_stale(
             repo = repo,
             cutoff = cutoff
         );
+        // Collect every page before acting; see inactive_rebase.
         let items = github
             .all_pages(
                 github
@@ -203,6 +222,7 @@ async fn rebase_label(
     github: &octocrab::Octocrab,
     config: &Config,
     github_repo: &Vec<util::Slug>,
+    cache_file: &Option<std::path::PathBuf>,
     dry_run: bool,
 ) -> octocrab::Result<()> {
     let id_needs_rebase_comment = util::IdComment::NeedsRebase.str();
@@ -211,47 +231,132 @@ async fn rebase_label(
 
     println!("Apply rebase label");
 
+    let cache_err = "cache file error";
+    let mut cache: std::collections::HashMap<String, CacheEntry> = match cache_file {
+        Some(f) if f.is_file() => {
+            serde_json::from_reader(std::fs::File::open(f).expect(cache_err)).expect(cache_err)
+        }
+        _ => Default::default(),
+    };
+
     for util::Slug { owner, repo } in github_repo {
         println!("Get open pulls for {}/{} ...", owner, repo);
         let issues_api = github.issues(owner, repo);
         let pulls_api = github.pulls(owner, repo);
-        let pulls = github
-            .all_pages(
-                pulls_api
-                    .list()
-                    .state(octocrab::params::State::Open)
-                    .send()
-                    .await?,
-            )
-            .await?;
+        // A single GraphQL query per page of 100 pulls replaces the REST
+        // pull listing and the per-pull mergeable and label lookups.
+        let query = r#"
+            query($owner: String!, $name: String!, $cursor: String) {
+              repository(owner: $owner, name: $name) {
+                pullRequests(states: OPEN, first: 100, after: $cursor) {
+                  nodes { number mergeable headRefOid baseRefOid labels(first: 100) { nodes { name } } }
+                  pageInfo { hasNextPage endCursor }
+                }
+              }
+            }"#;
+        let err = "remote api error";
+        let mut pulls = Vec::new();
+        let mut cursor = serde_json::Value::Null;
+        loop {
+            let reply: serde_json::Value = github
+                .graphql(&serde_json::json!({
+                    "query": query,
+                    "variables": { "owner": owner, "name": repo, "cursor": cursor },
+                }))
+                .await?;
+            let pull_requests = &reply["data"]["repository"]["pullRequests"];
+            for p in pull_requests["nodes"].as_array().expect(err) {
+                let found_label_rebase = p["labels"]["nodes"]
+                    .as_array()
+                    .expect(err)
+                    .iter()
+                    .any(|l| l["name"].as_str().expect(err) == config.needs_rebase_label);
+                pulls.push((
+                    p["number"].as_u64().expect(err),
+                    p["mergeable"].as_str().expect(err).to_string(),
+                    found_label_rebase,
+                    p["headRefOid"].as_str().expect(err).to_string(),
+                    p["baseRefOid"].as_str().expect(err).to_string(),
+                ));
+            }
+            let page_info = &pull_requests["pageInfo"];
+            if !page_info["hasNextPage"].as_bool().expect(err) {
+                break;
+            }
+            cursor = page_info["endCursor"].clone();
+        }
         println!("Open pulls: {}", pulls.len());
-        for (i, pull) in pulls.iter().enumerate() {
+        // GitHub has not computed the mergeable state for some pulls yet.
+        // Serve pulls whose head and base are unchanged since the last run
+        // from the cache, and resolve the rest concurrently, overlapping the
+        // per-pull polls, instead of waiting for each one in turn.
+        let cache_key = |n: &u64| format!("{owner}/{repo}#{n}");
+        let cached = |n: &u64, head: &str, base: &str| {
+            cache
+                .get(&cache_key(n))
+                .filter(|e| e.head == head && e.base == base)
+                .map(|e| e.mergeable)
+        };
+        let pending = pulls
+            .iter()
+            .filter(|(n, m, _, head, base)| {
+                m != "MERGEABLE" && m != "CONFLICTING" && cached(n, head, base).is_none()
+            })
+            .map(|(n, _, _, _, _)| *n)
+            .collect::<Vec<_>>();
+        let resolved = futures::future::try_join_all(
+            pending
+                .iter()
+                .map(|n| util::get_pull_mergeable(&pulls_api, *n)),
+        )
+        .await?;
+        let resolved = pending
+            .iter()
+            .zip(resolved)
+            .collect::<std::collections::HashMap<_, _>>();
+        // None means the pull was closed while resolving its state.
+        let states = pulls
+            .iter()
+            .map(|(n, m, _, head, base)| match m.as_str() {
+                "MERGEABLE" => Some(true),
+                "CONFLICTING" => Some(false),
+                _ => match cached(n, head, base) {
+                    Some(m) => Some(m),
+                    None => resolved[n].as_ref().map(|p| p.mergeable.unwrap()),
+                },
+            })
+            .collect::<Vec<_>>();
+        for (i, ((number, _, found_label_rebase, head, base), state)) in
+            pulls.iter().zip(&states).enumerate()
+        {
+            let found_label_rebase = *found_label_rebase;
             println!(
                 "{}/{} (Pull: {}/{}#{})",
                 i,
                 pulls.len(),
                 owner,
                 repo,
-                pull.number
+                number
             );
-            let pull = util::get_pull_mergeable(&pulls_api, pull.number).await?;
-            let pull = match pull {
+            let mergeable = match state {
                 None => {
                     continue;
                 }
-                Some(p) => p,
+                Some(m) => *m,
             };
-            let labels = github
-                .all_pages(issues_api.list_labels_for_issue(pull.number).send().await?)
-                .await?;
-            let found_label_rebase = labels
-                .into_iter()
-                .any(|l| l.name == config.needs_rebase_label);
-            if pull.mergeable.unwrap() {
+            cache.insert(
+                cache_key(number),
+                CacheEntry {
+                    head: head.to_string(),
+                    base: base.to_string(),
+                    mergeable,
+                },
+            );
+            if mergeable {
                 if found_label_rebase {
                     println!("... remove label '{}')", config.needs_rebase_label);
                     let all_comments = github
-                        .all_pages(issues_api.list_comments(pull.number).send().await?)
+                        .all_pages(issues_api.list_comments(*number).send().await?)
                         .await?;
                     let comments = all_comments
                         .iter()
@@ -265,7 +370,7 @@ async fn rebase_label(
                     println!("... delete {} comments", comments.len());
                     if !dry_run {
                         issues_api
-                            .remove_label(pull.number, &config.needs_rebase_label)
+                            .remove_label(*number, &config.needs_rebase_label)
                             .await?;
                         for c in comments {
                             issues_api.delete_comment(c.id).await?;
@@ -276,7 +381,7 @@ async fn rebase_label(
                 println!("... add label '{}'", config.needs_rebase_label);
                 if !dry_run {
                     issues_api
-                        .add_labels(pull.number, &[config.needs_rebase_label.to_string()])
+                        .add_labels(*number, &[config.needs_rebase_label.to_string()])
                         .await?;
                     let text = format!(
                         "{}\n{}",
@@ -286,11 +391,14 @@ async fn rebase_label(
                             .replace("{owner}", owner)
                             .replace("{repo}", repo)
                     );
-                    issues_api.create_comment(pull.number, text).await?;
+                    issues_api.create_comment(*number, text).await?;
                 }
             }
         }
     }
+    if let Some(f) = cache_file {
+        serde_json::to_writer(std::fs::File::create(f).expect(cache_err), &cache).expect(cache_err);
+    }
     Ok(())
 }
 
@@ -307,7 +415,14 @@ async fn main() -> octocrab::Result<()> {
     inactive_rebase(&github, &config, &args.github_repo, args.dry_run).await?;
     inactive_ci(&github, &config, &args.github_repo, args.dry_run).await?;
     inactive_stale(&github, &config, &args.github_repo, args.dry_run).await?;
-    rebase_label(&github, &config, &args.github_repo, args.dry_run).await?;
+    rebase_label(
+        &github,
+        &config,
+        &args.github_repo,
+        &args.cache_file,
+        args.dry_run,
+    )
+    .await?;
 
     Ok(())
 }
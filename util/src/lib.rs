@@ -29,7 +29,10 @@ impl std::str::FromStr for Slug {
 
 #[cfg(feature = "github")]
 pub fn get_octocrab(token: Option<String>) -> octocrab::Result<octocrab::Octocrab> {
-    let build = octocrab::Octocrab::builder();
+    // Retry transient failures (e.g. secondary rate limits) with a delay
+    // instead of falling over mid-iteration.
+    let build = octocrab::Octocrab::builder()
+        .add_retry_config(octocrab::service::middleware::retry::RetryConfig::Simple(3));
     match token {
         Some(tok) => build.personal_token(tok),
         None => build,
@@ -56,9 +59,9 @@ impl IdComment {
     pub fn str(&self) -> &'static str {
         match self {
             Self::NeedsRebase => "<!--cf906140f33d8803c4a75a2196329ecb-->",
-            Self::CiFailed=> "<!--85328a0da195eb286784d51f73fa0af9-->",
+            Self::CiFailed => "<!--85328a0da195eb286784d51f73fa0af9-->",
             Self::InactiveRebase => "<!--13523179cfe9479db18ec6c5d236f789-->",
-            Self::InactiveCi=> "<!--2e250dc3d92b2c9115b66051148d6e47-->",
+            Self::InactiveCi => "<!--2e250dc3d92b2c9115b66051148d6e47-->",
             Self::InactiveStale => "<!--8ac04cdde196e94527acabf64b896448-->",
             Self::Metadata => "<!--e57a25ab6845829454e8d69fc972939a-->",
             Self::SecCodeCoverage => "<!--006a51241073e994b41acfe9ec718e94-->",
@@ -73,6 +76,14 @@ pub fn git() -> std::process::Command {
     std::process::Command::new("git")
 }
 
+/// Run git in the given directory instead of the process-global working
+/// directory, which would rule out running commands from several threads.
+pub fn git_in(dir: &std::path::Path) -> std::process::Command {
+    let mut cmd = git();
+    cmd.current_dir(dir);
+    cmd
+}
+
 pub fn check_call(cmd: &mut std::process::Command) {
     let status = cmd.status().expect("command error");
     assert!(status.success());
@@ -92,6 +103,33 @@ pub fn check_output(cmd: &mut std::process::Command) -> String {
         .to_string()
 }
 
+/// Run a single long-lived process, feeding it a whole batch of input lines
+/// over stdin, instead of one process per line.
+pub fn check_output_with_input(cmd: &mut std::process::Command, input: &str) -> String {
+    use std::io::Write;
+    let mut child = cmd
+        .stdin(std::process::Stdio::piped())
+        .stdout(std::process::Stdio::piped())
+        .spawn()
+        .expect("command error");
+    let mut stdin = child.stdin.take().expect("command error");
+    // Feed stdin from its own thread while this thread drains stdout.
+    // Writing the whole batch up front would deadlock as soon as both the
+    // input and the output outgrow the pipe buffers: the child blocks
+    // writing stdout while the parent blocks writing stdin.
+    let out = std::thread::scope(|scope| {
+        scope.spawn(move || {
+            stdin.write_all(input.as_bytes()).expect("command error");
+        });
+        child.wait_with_output().expect("command error")
+    });
+    assert!(out.status.success());
+    String::from_utf8(out.stdout)
+        .expect("invalid utf8")
+        .trim()
+        .to_string()
+}
+
 pub fn chdir(p: &std::path::Path) {
     std::env::set_current_dir(p).expect("chdir error")
 }
@@ -148,11 +186,24 @@ pub async fn get_metadata_sections(
     api_issues: &octocrab::issues::IssueHandler<'_>,
     pull_nr: u64,
 ) -> octocrab::Result<MetaComment> {
-    let comments = api
-        .all_pages(api_issues.list_comments(pull_nr).send().await?)
-        .await?;
-
-    Ok(get_metadata_sections_from_comments(&comments, pull_nr))
+    // Stream the comment pages and stop on the first match, instead of
+    // fetching all pages up front.
+    let mut page = api_issues.list_comments(pull_nr).send().await?;
+    loop {
+        let found = get_metadata_sections_from_comments(&page.items, pull_nr);
+        if found.id.is_some() {
+            return Ok(found);
+        }
+        match api.get_page(&page.next).await? {
+            Some(p) => page = p,
+            None => break,
+        }
+    }
+    Ok(MetaComment {
+        pull_num: pull_nr,
+        id: None,
+        sections: Vec::new(),
+    })
 }
 
 #[cfg(feature = "github")]
@@ -192,7 +243,7 @@ pub async fn update_metadata_comment(
     dry_run: bool,
 ) -> octocrab::Result<()> {
     if !comment.update(section, text) {
-        // Section up to date
+        // Section up to date, skip the no-op edit request
         return Ok(());
     }
     if comment.id.is_none() {
@@ -231,7 +282,10 @@ pub async fn get_pull_mergeable(
             return Ok(None);
         }
         if pull.mergeable.is_none() {
-            std::thread::sleep(std::time::Duration::from_secs(3));
+            // Yield to the runtime instead of blocking the thread, so
+            // sibling futures polled in the same task keep making progress
+            // during the backoff.
+            tokio::time::sleep(std::time::Duration::from_secs(3)).await;
             continue;
         }
         return Ok(Some(pull));